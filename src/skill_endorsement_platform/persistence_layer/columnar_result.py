@@ -0,0 +1,38 @@
+"""Implements the ColumnarResult class."""
+
+
+class ColumnarResult():
+    """Query result holding column names once and each row as a tuple.
+
+    rows may also be a one-shot iterator of tuples when streaming; only
+    iteration is supported then.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns, rows) -> None:
+        """Initializes object."""
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def column(self, name: str) -> tuple:
+        """Returns every value of one column."""
+        index = self.columns.index(name)
+        return tuple(row[index] for row in self.rows)
+
+    def to_columns(self) -> dict:
+        """Returns a dict of column name -> tuple of values."""
+        if not self.rows:
+            return {name: () for name in self.columns}
+        return dict(zip(self.columns, zip(*self.rows)))
+
+    def to_dicts(self) -> list:
+        """Returns the rows as dicts, as execute_sql_query does."""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
@@ -1,6 +1,7 @@
 """Defines the MySQLPersistenceWrapper class."""
 
 from skill_endorsement_platform.application_base import ApplicationBase
+from skill_endorsement_platform.persistence_layer.columnar_result import ColumnarResult
 from mysql import connector
 from mysql.connector.pooling import (MySQLConnectionPool)
 import inspect
@@ -82,6 +83,13 @@ class MySQLPersistenceWrapper(ApplicationBase):
                 ) VALUES (%s, %s, %s, %s, %s)
             """,
 
+            "get recent endorsement activity": """
+                SELECT endorsee_id, skill_id,
+                       UNIX_TIMESTAMP(created_at) AS created_at
+                FROM endorsements_xref
+                WHERE created_at >= NOW() - INTERVAL 7 DAY
+            """,
+
             "get endorsements by endorser":
             "SELECT * FROM endorsements_xref WHERE endorser_id = %s",
 
@@ -119,7 +127,69 @@ class MySQLPersistenceWrapper(ApplicationBase):
                     cursor.execute(sql, params)
                     if ("add" in query_name) or ("remove" in query_name):
                         connection.commit()
-                    results = cursor.fetchall()
+                    # writes have no result set; return [] so callers can
+                    # tell a successful write from a failed one (None)
+                    results = cursor.fetchall() if cursor.with_rows else []
+
+        except Exception as e:
+            self._logger.log_error(
+                f"[PersistenceLayer] Query failed: {query_name}: {e}"
+            )
+
+        return results
+
+    def execute_sql_query_columnar(self, query_name: str, *params):
+        """Runs a read query and returns a ColumnarResult (None on failure).
+
+        Reads only; add/remove queries are rejected, use execute_sql_query.
+        """
+        results = None
+        if self._is_write(query_name):
+            self._logger.log_error(
+                f"[PersistenceLayer] Not a read query: {query_name}"
+            )
+            return results
+        try:
+            connection = self._connection_pool.get_connection()
+            with connection:
+                cursor = connection.cursor()
+                with cursor:
+                    sql = self.QUERIES[query_name]
+                    cursor.execute(sql, params)
+                    results = ColumnarResult(cursor.column_names,
+                                             cursor.fetchall())
+
+        except Exception as e:
+            self._logger.log_error(
+                f"[PersistenceLayer] Query failed: {query_name}: {e}"
+            )
+
+        return results
+
+    def stream_sql_query(self, query_name: str, consumer, *params,
+                         batch_size: int = 512):
+        """Runs a read query and streams its rows to consumer.
+
+        consumer(columns, rows) is called while the connection is open;
+        rows is an iterator fed by cursor.fetchmany(batch_size). Returns
+        what consumer returns (None on failure). Reads only, as for
+        execute_sql_query_columnar.
+        """
+        results = None
+        if self._is_write(query_name):
+            self._logger.log_error(
+                f"[PersistenceLayer] Not a read query: {query_name}"
+            )
+            return results
+        try:
+            connection = self._connection_pool.get_connection()
+            with connection:
+                cursor = connection.cursor()
+                with cursor:
+                    sql = self.QUERIES[query_name]
+                    cursor.execute(sql, params)
+                    results = consumer(cursor.column_names,
+                                       self._fetch_batches(cursor, batch_size))
 
         except Exception as e:
             self._logger.log_error(
@@ -133,6 +203,19 @@ class MySQLPersistenceWrapper(ApplicationBase):
 
         ##### Private Utility Methods #####
 
+    @staticmethod
+    def _is_write(query_name: str) -> bool:
+        return ("add" in query_name) or ("remove" in query_name)
+
+    @staticmethod
+    def _fetch_batches(cursor, batch_size: int):
+        """Yields rows, fetching batch_size rows at a time."""
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
     def _initialize_database_connection_pool(self, config:dict)->MySQLConnectionPool:
         """Initializes database connection pool."""
         try:
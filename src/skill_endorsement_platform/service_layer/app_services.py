@@ -2,6 +2,9 @@
 
 from skill_endorsement_platform.application_base import ApplicationBase
 from skill_endorsement_platform.persistence_layer.mysql_persistence_wrapper import MySQLPersistenceWrapper
+from skill_endorsement_platform.persistence_layer.columnar_result import ColumnarResult
+from skill_endorsement_platform.service_layer.endorsement_activity import EndorsementActivity
+from skill_endorsement_platform.service_layer import result_export
 import inspect
 import json
 
@@ -14,6 +17,8 @@ class AppServices(ApplicationBase):
         super().__init__(subclass_name=self.__class__.__name__,
 				   logfile_prefix_name=self.META["log_prefix"])
         self.DB = MySQLPersistenceWrapper(config)
+        self.activity = EndorsementActivity()
+        self._bootstrap_activity()
         self._logger.log_debug(f'{inspect.currentframe().f_code.co_name}:It works!')
 
     # params:
@@ -21,9 +26,74 @@ class AppServices(ApplicationBase):
     # args  (any)    - the arguments for the sql query (e.g. name "john" or id "2")
     # return sql query result
     def query(self, query_name: str, *args):
-        return self.DB.execute_sql_query(query_name, *args)
+        results = self.DB.execute_sql_query(query_name, *args)
+        # feed successful endorsements (endorser, endorsee, skill, ...) to
+        # the in-memory activity counters
+        if query_name == "add endorsement" and results is not None:
+            self.activity.record(args[1], args[2])
+        # removing a user or skill cascades to endorsements_xref, so the
+        # counters are rebuilt from the table
+        if "remove" in query_name and results is not None:
+            self.activity = EndorsementActivity()
+            self._bootstrap_activity()
+        return results
+
+    # return query result as a ColumnarResult (column names once, rows as tuples)
+    def query_columnar(self, query_name: str, *params):
+        return self.DB.execute_sql_query_columnar(query_name, *params)
 
     # return query result in json format
     def query_json(self, query_name: str, *params) -> str:
-        results = self.DB.execute_sql_query(query_name, *params)
-        return json.dumps(results, default=str)
+        # writes need the commit and the activity hook in query()
+        if ("add" in query_name) or ("remove" in query_name):
+            return json.dumps(self.query(query_name, *params), default=str)
+        results = self.DB.execute_sql_query_columnar(query_name, *params)
+        if results is None:
+            return json.dumps(results)
+        return result_export.dumps_json(results)
+
+    # params:
+    # fp (file) - text file-like object (for sockets use socket.makefile("w"))
+    # ndjson (bool) - one object per line instead of a json array
+    # return number of rows written, or None if the query failed
+    def export_json(self, fp, query_name: str, *params, ndjson: bool = True):
+        writer = result_export.write_ndjson if ndjson else result_export.write_json
+        return self.DB.stream_sql_query(
+            query_name,
+            lambda columns, rows: writer(ColumnarResult(columns, rows), fp),
+            *params,
+            batch_size=result_export.WRITE_BATCH)
+
+    # params:
+    # path (string) - file to write, read back with result_export.Snapshot
+    # query (string) - a whole-table query, e.g. "get all endorsements"
+    # return number of rows written, or None if the query failed
+    def export_snapshot(self, path: str, query_name: str, *params):
+        results = self.DB.execute_sql_query_columnar(query_name, *params)
+        if results is None:
+            return None
+        return result_export.write_snapshot(results, path)
+
+    # window (string) - "hour", "day" or "week"
+    # k       (int)    - number of entries to return
+    # return most-endorsed skills in the window, highest first
+    def trending_skills(self, window: str = "day", k: int = 10) -> list:
+        return self.activity.trending_skills(window, k)
+
+    # return most-endorsed users in the window, highest first
+    def trending_endorsees(self, window: str = "day", k: int = 10) -> list:
+        return self.activity.trending_endorsees(window, k)
+
+    # return endorsements received by a user per window and per hour
+    def endorsement_velocity(self, endorsee_id: int) -> dict:
+        return self.activity.velocity(endorsee_id)
+
+    def _bootstrap_activity(self) -> None:
+        """Loads the last week of endorsements into the activity counters."""
+        rows = self.DB.execute_sql_query("get recent endorsement activity")
+        if rows is None:
+            self._logger.log_error(
+                f'{inspect.currentframe().f_code.co_name}: could not load endorsement activity'
+            )
+            return
+        self.activity.load(rows)
@@ -0,0 +1,267 @@
+"""Implements in-memory, time-windowed endorsement activity counters."""
+
+import heapq
+import threading
+import time
+
+# window name -> (bucket width in seconds, number of buckets)
+WINDOWS = {
+    "hour": (60, 60),           # 60 x 1 minute
+    "day":  (3600, 24),         # 24 x 1 hour
+    "week": (86400, 7),         # 7 x 1 day
+}
+HORIZON = max(width * size for width, size in WINDOWS.values())
+
+
+class RingCounter():
+    """Counts events in a sliding window of fixed-width time buckets."""
+
+    __slots__ = ("_width", "_counts", "_epochs", "_total", "_low")
+
+    def __init__(self, width: int, size: int) -> None:
+        """Initializes object."""
+        self._width = width
+        self._counts = [0] * size
+        self._epochs = [-1] * size
+        self._total = 0
+        # lower bound of the oldest live epoch; lets count() skip the scan
+        self._low = None
+
+    def add(self, ts: float, amount: int = 1) -> None:
+        """Adds amount to the bucket holding timestamp ts."""
+        epoch = int(ts // self._width)
+        slot = epoch % len(self._counts)
+        if self._epochs[slot] != epoch:
+            if self._epochs[slot] > epoch:
+                # older than anything this slot can still represent
+                return
+            self._total -= self._counts[slot]
+            self._counts[slot] = 0
+            self._epochs[slot] = epoch
+            if self._low is None or epoch < self._low:
+                self._low = epoch
+        self._counts[slot] += amount
+        self._total += amount
+
+    def count(self, now: float) -> int:
+        """Returns the number of events in the window ending at now."""
+        oldest = int(now // self._width) - len(self._counts)
+        if self._low is None or self._low > oldest:
+            return self._total
+        self._low = None
+        for slot, epoch in enumerate(self._epochs):
+            if epoch == -1:
+                continue
+            if epoch <= oldest:
+                self._total -= self._counts[slot]
+                self._counts[slot] = 0
+                self._epochs[slot] = -1
+            elif self._low is None or epoch < self._low:
+                self._low = epoch
+        return self._total
+
+
+class TopCandidates():
+    """Keys admitted as top-k candidates for one window.
+
+    ceiling is an upper bound on the count of every key outside the set:
+    a key's windowed count only grows when it gets an event, and every
+    event re-runs admission, so an outsider can never exceed the count it
+    had when it was last rejected or evicted.
+    """
+
+    __slots__ = ("keys", "ceiling")
+
+    def __init__(self) -> None:
+        """Initializes object."""
+        self.keys = set()
+        self.ceiling = 0
+
+
+class WindowedTopK():
+    """Tracks per-key windowed counts and top-k candidates per window.
+
+    Exact counts live in one RingCounter per key and window; keys with no
+    events left in any window are pruned once a day. Each window keeps at
+    most capacity candidate keys, admitted by exact count: an outsider
+    replaces the weakest candidate only when its count is higher. top()
+    ranks the candidates, and falls back to ranking every tracked key when
+    the candidates cannot prove the answer (the k-th count is below the
+    ceiling of the keys left out, e.g. after candidates' events expired).
+    """
+
+    def __init__(self, capacity: int = 64, clock=time.time) -> None:
+        """Initializes object."""
+        self._capacity = capacity
+        self._clock = clock
+        self._rings = {}
+        self._candidates = {window: TopCandidates() for window in WINDOWS}
+        self._pruned_day = None
+
+    def add(self, key, ts: float = None, admit: bool = True) -> None:
+        """Records one event for key at timestamp ts (default: now).
+
+        Bulk loads pass admit=False and call refresh() once at the end.
+        """
+        now = self._clock()
+        if ts is None:
+            ts = now
+        if ts <= now - HORIZON:
+            return
+        self._maybe_prune(now)
+        rings = self._rings.get(key)
+        if rings is None:
+            rings = {window: RingCounter(*spec)
+                     for window, spec in WINDOWS.items()}
+            self._rings[key] = rings
+        for window, (width, size) in WINDOWS.items():
+            if ts <= now - width * size:
+                continue
+            rings[window].add(ts)
+            if admit:
+                self._admit(window, key, now)
+
+    def counts(self, key) -> dict:
+        """Returns the event count of key in every window."""
+        now = self._clock()
+        rings = self._rings.get(key)
+        if rings is None:
+            return {window: 0 for window in WINDOWS}
+        return {window: ring.count(now) for window, ring in rings.items()}
+
+    def top(self, window: str, k: int) -> list:
+        """Returns up to k (key, count) pairs, highest count first.
+
+        Costs O(capacity) ring lookups plus O(capacity log k) selection,
+        or a scan of every tracked key when the candidates are not enough.
+        """
+        if window not in WINDOWS:
+            raise KeyError(f"unknown window '{window}'")
+        now = self._clock()
+        self._maybe_prune(now)
+        candidates = self._candidates[window]
+        ranked = []
+        for key in candidates.keys:
+            count = self._count(key, window, now)
+            if count:
+                ranked.append((key, count))
+        best = heapq.nlargest(k, ranked, key=lambda pair: pair[1])
+        if candidates.ceiling == 0 or \
+                (len(best) == k and best[-1][1] >= candidates.ceiling):
+            return best
+        return self._rebuild(window, k, now)
+
+    def refresh(self) -> None:
+        """Rebuilds every window's candidates from the exact counts."""
+        now = self._clock()
+        for window in WINDOWS:
+            self._rebuild(window, 0, now)
+
+    def _count(self, key, window: str, now: float) -> int:
+        rings = self._rings.get(key)
+        return rings[window].count(now) if rings else 0
+
+    def _admit(self, window: str, key, now: float) -> None:
+        """Offers key as a candidate for window after one of its events."""
+        candidates = self._candidates[window]
+        if key in candidates.keys:
+            return
+        if len(candidates.keys) < self._capacity:
+            candidates.keys.add(key)
+            return
+        count = self._count(key, window, now)
+        victim, floor = None, None
+        for member in candidates.keys:
+            member_count = self._count(member, window, now)
+            if floor is None or member_count < floor:
+                victim, floor = member, member_count
+        if count > floor:
+            candidates.keys.remove(victim)
+            candidates.keys.add(key)
+            candidates.ceiling = max(candidates.ceiling, floor)
+        else:
+            candidates.ceiling = max(candidates.ceiling, count)
+
+    def _rebuild(self, window: str, k: int, now: float) -> list:
+        """Ranks every tracked key and refills the window's candidates."""
+        ranked = []
+        for key in self._rings:
+            count = self._count(key, window, now)
+            if count:
+                ranked.append((key, count))
+        keep = heapq.nlargest(self._capacity + 1, ranked,
+                              key=lambda pair: pair[1])
+        candidates = self._candidates[window]
+        candidates.keys = {key for key, count in keep[:self._capacity]}
+        candidates.ceiling = keep[self._capacity][1] \
+            if len(keep) > self._capacity else 0
+        return keep[:k]
+
+    def _maybe_prune(self, now: float) -> None:
+        """Drops keys with no events left in any window, once a day."""
+        day = int(now // 86400)
+        if self._pruned_day == day:
+            return
+        self._pruned_day = day
+        idle = [key for key, rings in self._rings.items()
+                if not any(ring.count(now) for ring in rings.values())]
+        for key in idle:
+            del self._rings[key]
+            for candidates in self._candidates.values():
+                candidates.keys.discard(key)
+
+
+class EndorsementActivity():
+    """Streaming aggregator of endorsements per skill and per endorsee."""
+
+    def __init__(self, capacity: int = 64, clock=time.time) -> None:
+        """Initializes object."""
+        self._lock = threading.Lock()
+        self.skills = WindowedTopK(capacity, clock)
+        self.endorsees = WindowedTopK(capacity, clock)
+
+    def record(self, endorsee_id: int, skill_id: int, created_at=None) -> None:
+        """Records one endorsement; created_at is a Unix epoch (default: now)."""
+        if created_at is not None:
+            created_at = float(created_at)
+        with self._lock:
+            self.skills.add(skill_id, created_at)
+            self.endorsees.add(endorsee_id, created_at)
+
+    def load(self, rows) -> None:
+        """Bootstraps counters from endorsements_xref rows.
+
+        created_at must be UNIX_TIMESTAMP(created_at), so bootstrapped and
+        live events share the same clock regardless of the session time zone.
+        """
+        with self._lock:
+            for row in rows or []:
+                created_at = row["created_at"]
+                if created_at is not None:
+                    created_at = float(created_at)
+                self.skills.add(row["skill_id"], created_at, admit=False)
+                self.endorsees.add(row["endorsee_id"], created_at, admit=False)
+            self.skills.refresh()
+            self.endorsees.refresh()
+
+    def trending_skills(self, window: str = "day", k: int = 10) -> list:
+        with self._lock:
+            top = self.skills.top(window, k)
+        return [{"skill_id": key, "endorsements": count} for key, count in top]
+
+    def trending_endorsees(self, window: str = "day", k: int = 10) -> list:
+        with self._lock:
+            top = self.endorsees.top(window, k)
+        return [{"endorsee_id": key, "endorsements": count}
+                for key, count in top]
+
+    def velocity(self, endorsee_id: int) -> dict:
+        """Returns endorsements received per window and per hour."""
+        with self._lock:
+            counts = self.endorsees.counts(endorsee_id)
+        velocity = {"endorsee_id": endorsee_id}
+        for window, (width, size) in WINDOWS.items():
+            velocity[window] = counts[window]
+            velocity[f"{window}_per_hour"] = \
+                counts[window] * 3600 / (width * size)
+        return velocity
@@ -0,0 +1,356 @@
+"""Implements streaming JSON encoders and binary snapshots of query results."""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii
+
+from skill_endorsement_platform.persistence_layer.columnar_result import ColumnarResult
+
+##### JSON #####
+
+def _encode_decimal(value: Decimal) -> str:
+    # DECIMAL columns (e.g. years_experience) are written as JSON numbers
+    if value.is_finite():
+        return str(value)
+    return encode_basestring_ascii(str(value))
+
+_INFINITY = float("inf")
+
+def _encode_float(value: float) -> str:
+    # same spelling as json.dumps for non-finite floats
+    if value != value:
+        return "NaN"
+    if value == _INFINITY:
+        return "Infinity"
+    if value == -_INFINITY:
+        return "-Infinity"
+    return float.__repr__(value)
+
+# exact type -> JSON text; anything else falls back to a string of str(value)
+_ENCODERS = {
+    str:        encode_basestring_ascii,
+    int:        int.__repr__,
+    float:      _encode_float,
+    bool:       lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+    datetime:   lambda value: '"' + value.isoformat(" ") + '"',
+    date:       lambda value: '"' + value.isoformat() + '"',
+    Decimal:    _encode_decimal,
+}
+
+# number of encoded rows handed to fp.write() at once
+WRITE_BATCH = 512
+
+
+def encode_value(value) -> str:
+    """Returns the JSON text for one column value."""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        return encode_basestring_ascii(str(value))
+    return encoder(value)
+
+
+def iter_json_objects(result: ColumnarResult):
+    """Yields every row of result as a JSON object string."""
+    # encode the keys once instead of once per row
+    keys = [encode_basestring_ascii(name) + ": " for name in result.columns]
+    encoders = _ENCODERS
+    for row in result.rows:
+        parts = []
+        for key, value in zip(keys, row):
+            encoder = encoders.get(type(value))
+            parts.append(key + (encoder(value) if encoder
+                                else encode_basestring_ascii(str(value))))
+        yield "{" + ", ".join(parts) + "}"
+
+
+def write_ndjson(result: ColumnarResult, fp) -> int:
+    """Writes one JSON object per line to a text file-like object.
+
+    Sockets can be written to through socket.makefile("w").
+    Returns the number of rows written.
+    """
+    batch = []
+    count = 0
+    for line in iter_json_objects(result):
+        batch.append(line)
+        if len(batch) == WRITE_BATCH:
+            fp.write("\n".join(batch) + "\n")
+            count += len(batch)
+            batch = []
+    if batch:
+        fp.write("\n".join(batch) + "\n")
+        count += len(batch)
+    return count
+
+
+def write_json(result: ColumnarResult, fp) -> int:
+    """Writes result as a JSON array of objects to a text file-like object.
+
+    Returns the number of rows written.
+    """
+    fp.write("[")
+    batch = []
+    count = 0
+    for text in iter_json_objects(result):
+        batch.append(text)
+        if len(batch) == WRITE_BATCH:
+            fp.write((", " if count else "") + ", ".join(batch))
+            count += len(batch)
+            batch = []
+    if batch:
+        fp.write((", " if count else "") + ", ".join(batch))
+        count += len(batch)
+    fp.write("]")
+    return count
+
+
+def dumps_json(result: ColumnarResult) -> str:
+    """Returns result as a JSON array of objects."""
+    return "[" + ", ".join(iter_json_objects(result)) + "]"
+
+##### Binary snapshots #####
+#
+# layout: MAGIC | header length (<Q) | JSON header | padding | buffers
+# Every buffer starts on an 8 byte boundary so it can be cast in place.
+# Column types:
+#   int64     - 'q' values (int columns that fit in a signed 64 bit int)
+#   float64   - 'd' values (float columns)
+#   decimal   - 'q' values scaled by 10 ** scale (scale is in the column
+#               header), read back as Decimal (DECIMAL columns, ints
+#               mixed with decimals)
+#   decimal_text - stored like utf8, read back as Decimal (NaN/Infinity,
+#               or scaled values / ints outside the int64 range)
+#   timestamp - 'q' microseconds since 1970-01-01 (naive as stored,
+#               tz-aware values are converted to UTC)
+#   utf8      - 'q' offsets (rows + 1) and the concatenated utf-8 bytes
+# Each column also has a validity bitmap, bit set = value is not NULL.
+
+MAGIC = b"SEPSNAP1"
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _column_type(values) -> tuple:
+    """Returns the column type and, for decimal columns, the scale."""
+    kinds = {type(value) for value in values if value is not None}
+    if not kinds:
+        return "utf8", None
+    if kinds == {int}:
+        if all(_INT64_MIN <= value <= _INT64_MAX
+               for value in values if value is not None):
+            return "int64", None
+        return "decimal_text", None
+    if kinds <= {int, Decimal}:
+        scale = _decimal_scale(values)
+        if scale is None:
+            return "decimal_text", None
+        return "decimal", scale
+    if kinds == {float}:
+        return "float64", None
+    if kinds == {datetime}:
+        return "timestamp", None
+    return "utf8", None
+
+
+def _scaled(value, scale: int) -> int:
+    """Returns value * 10 ** scale exactly, without a decimal context."""
+    if isinstance(value, int):
+        return value * 10 ** scale
+    sign, digits, exponent = value.as_tuple()
+    unscaled = int("".join(map(str, digits)) or "0")
+    scaled = unscaled * 10 ** (exponent + scale)
+    return -scaled if sign else scaled
+
+
+def _decimal_scale(values):
+    """Returns the scale storing every value as int64, or None."""
+    scale = 0
+    for value in values:
+        if isinstance(value, Decimal):
+            if not value.is_finite():
+                return None
+            scale = max(scale, -value.as_tuple().exponent)
+    for value in values:
+        if value is not None and \
+                not _INT64_MIN <= _scaled(value, scale) <= _INT64_MAX:
+            return None
+    return scale
+
+
+def _column_buffers(values, column_type: str, scale: int = None) -> dict:
+    """Returns the named buffers holding one column."""
+    validity = bytearray((len(values) + 7) // 8)
+    for index, value in enumerate(values):
+        if value is not None:
+            validity[index >> 3] |= 1 << (index & 7)
+
+    if column_type == "int64":
+        data = array("q", (0 if value is None else value for value in values))
+    elif column_type == "decimal":
+        data = array("q", (0 if value is None else _scaled(value, scale)
+                           for value in values))
+    elif column_type == "float64":
+        data = array("d", (0.0 if value is None else value
+                           for value in values))
+    elif column_type == "timestamp":
+        data = array("q", (0 if value is None
+                           else (_naive_utc(value) - _EPOCH) // _ONE_MICROSECOND
+                           for value in values))
+    else:
+        offsets = array("q", [0])
+        blob = bytearray()
+        for value in values:
+            if value is not None:
+                blob += str(value).encode("utf-8")
+            offsets.append(len(blob))
+        return {"validity": validity, "offsets": offsets.tobytes(),
+                "data": bytes(blob)}
+    return {"validity": validity, "data": data.tobytes()}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    offset = value.utcoffset()
+    if offset is None:
+        return value
+    return value.replace(tzinfo=None) - offset
+
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+
+def write_snapshot(result: ColumnarResult, path: str) -> int:
+    """Writes result to path as a memory-mappable snapshot.
+
+    Returns the number of rows written.
+    """
+    columns = []
+    buffers = []
+    position = 0
+    for name, values in result.to_columns().items():
+        column_type, scale = _column_type(values)
+        column = {"name": name, "type": column_type}
+        if scale is not None:
+            column["scale"] = scale
+        for kind, buffer in _column_buffers(values, column_type,
+                                            scale).items():
+            column[kind] = [position, len(buffer)]
+            buffers.append(buffer)
+            position += len(buffer)
+            padding = _pad(len(buffer))
+            buffers.append(b"\0" * padding)
+            position += padding
+        columns.append(column)
+
+    header = json.dumps({"byteorder": sys.byteorder,
+                         "rows": len(result),
+                         "columns": columns}).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(header)) + header
+    with open(path, "wb") as f:
+        f.write(prefix + b"\0" * _pad(len(prefix)))
+        for buffer in buffers:
+            f.write(buffer)
+    return len(result)
+
+
+class Snapshot():
+    """Read-only, memory-mapped view of a file written by write_snapshot."""
+
+    def __init__(self, path: str) -> None:
+        """Initializes object."""
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        (length,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + length])
+        if header["byteorder"] != sys.byteorder:
+            self._map.close()
+            raise ValueError(f"{path} was written on a "
+                             f"{header['byteorder']}-endian machine")
+        self._base = start + length + _pad(start + length)
+        self._rows = header["rows"]
+        self._columns = {column["name"]: column
+                         for column in header["columns"]}
+        self.columns = tuple(self._columns)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file; views returned by array() must be released first."""
+        self._map.close()
+
+    def array(self, name: str) -> memoryview:
+        """Returns a zero-copy typed view of a fixed-width column.
+
+        NULL rows hold 0; timestamps are microseconds since the epoch and
+        decimals are integers scaled by 10 ** scale(name).
+        """
+        column = self._columns[name]
+        if column["type"] in ("utf8", "decimal_text"):
+            raise ValueError(f"column '{name}' is not fixed-width")
+        code = "d" if column["type"] == "float64" else "q"
+        return self._buffer(column, "data").cast(code)
+
+    def scale(self, name: str) -> int:
+        """Returns the decimal scale of a decimal column."""
+        return self._columns[name]["scale"]
+
+    def column(self, name: str) -> tuple:
+        """Returns every value of one column as Python objects."""
+        column = self._columns[name]
+        validity = self._buffer(column, "validity")
+        valid = [bool(validity[index >> 3] & (1 << (index & 7)))
+                 for index in range(self._rows)]
+        if column["type"] in ("utf8", "decimal_text"):
+            convert = Decimal if column["type"] == "decimal_text" else str
+            offsets = self._buffer(column, "offsets").cast("q")
+            data = self._buffer(column, "data")
+            values = tuple(
+                convert(str(data[offsets[index]:offsets[index + 1]], "utf-8"))
+                if valid[index] else None
+                for index in range(self._rows))
+            offsets.release()
+            return values
+        data = self.array(name)
+        if column["type"] == "timestamp":
+            values = tuple(_EPOCH + timedelta(microseconds=value)
+                           if is_valid else None
+                           for value, is_valid in zip(data, valid))
+        elif column["type"] == "decimal":
+            scale = column["scale"]
+            values = tuple(Decimal(value).scaleb(-scale)
+                           if is_valid else None
+                           for value, is_valid in zip(data, valid))
+        else:
+            values = tuple(value if is_valid else None
+                           for value, is_valid in zip(data, valid))
+        data.release()
+        return values
+
+    def to_result(self) -> ColumnarResult:
+        """Loads the whole snapshot into a ColumnarResult."""
+        values = [self.column(name) for name in self.columns]
+        return ColumnarResult(self.columns, list(zip(*values)))
+
+    def _buffer(self, column: dict, kind: str) -> memoryview:
+        offset, length = column[kind]
+        start = self._base + offset
+        return memoryview(self._map)[start:start + length]
@@ -0,0 +1,67 @@
+"""Tests for the in-memory endorsement activity counters."""
+
+from skill_endorsement_platform.service_layer.endorsement_activity import EndorsementActivity
+
+
+def make_activity(now: float = 1_000_000.0, capacity: int = 64):
+    clock = [now]
+    return EndorsementActivity(capacity, lambda: clock[0]), clock
+
+
+def test_leader_survives_stream_of_one_off_keys():
+    activity, _ = make_activity()
+    for _ in range(10):
+        activity.record(1, 999)
+    for skill_id in range(300):
+        for _ in range(3):
+            activity.record(2, skill_id)
+
+    top = activity.trending_skills("day", 3)
+
+    assert top[0] == {"skill_id": 999, "endorsements": 10}
+    assert [entry["endorsements"] for entry in top[1:]] == [3, 3]
+
+
+def test_outsider_found_after_candidates_expire():
+    activity, clock = make_activity(capacity=2)
+    start = clock[0]
+    for skill_id in (1, 2):
+        for _ in range(5):
+            activity.record(1, skill_id, start - 23 * 3600)
+    for _ in range(4):
+        activity.record(1, 3, start)
+
+    clock[0] = start + 2 * 3600
+
+    assert activity.trending_skills("day", 1) == \
+        [{"skill_id": 3, "endorsements": 4}]
+
+
+def test_velocity_counts_each_window():
+    activity, clock = make_activity()
+    now = clock[0]
+    activity.record(7, 1, now - 30 * 60)
+    activity.record(7, 1, now - 5 * 3600)
+    activity.record(7, 1, now - 3 * 86400)
+
+    velocity = activity.velocity(7)
+
+    assert (velocity["hour"], velocity["day"], velocity["week"]) == (1, 2, 3)
+
+
+def test_load_matches_record():
+    rows = [{"endorsee_id": endorsee_id, "skill_id": skill_id,
+             "created_at": 1_000_000 - skill_id * 600}
+            for endorsee_id in range(5) for skill_id in range(100)
+            for _ in range(skill_id % 7)]
+    loaded, _ = make_activity(capacity=8)
+    recorded, _ = make_activity(capacity=8)
+    loaded.load(rows)
+    for row in rows:
+        recorded.record(row["endorsee_id"], row["skill_id"], row["created_at"])
+
+    for window in ("hour", "day", "week"):
+        assert [entry["endorsements"] for entry in
+                loaded.trending_skills(window, 5)] == \
+            [entry["endorsements"] for entry in
+             recorded.trending_skills(window, 5)]